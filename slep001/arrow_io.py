@@ -0,0 +1,122 @@
+"""
+Feeding the resampling transformers from Arrow record batches.
+
+The sources accepted are a Parquet file path, a ``pyarrow.Table``, a
+``pyarrow.RecordBatchReader`` or any iterable of ``pyarrow.RecordBatch``.
+Only the feature and target columns are read, and batches are processed one
+at a time, so memory scales with ``batch_size`` rather than with the dataset.
+Numeric columns without nulls are converted to NumPy without copy; the only
+copy is the assembly of each batch into a 2D ``X``.
+
+The transformers are not modified: the row positions within the batch are
+passed as ``y``, so that ``transform_pipe`` returns the positions of the kept
+rows, which are then taken from the Arrow batch. A ``sample_weight_column``
+is passed as ``sample_weight``, and replaced in the output by the weights
+returned for the kept rows, e.g. those of ``SubSampler(weighted=True)``.
+"""
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from subsampler import SubSampler
+
+
+def iter_record_batches(source, columns, batch_size=65536):
+    """Yield record batches of source restricted to columns."""
+    if isinstance(source, (str, os.PathLike)):
+        yield from pq.ParquetFile(source).iter_batches(batch_size=batch_size,
+                                                       columns=columns)
+        return
+    if isinstance(source, pa.Table):
+        source = source.select(columns).to_batches(max_chunksize=batch_size)
+    elif isinstance(source, pa.RecordBatch):
+        source = [source]
+    for batch in source:
+        yield pa.RecordBatch.from_arrays(
+            [batch.column(name) for name in columns], names=columns)
+
+
+def _column_to_numpy(batch, name):
+    column = batch.column(name)
+    if column.null_count:
+        raise ValueError("Column %r contains null values" % name)
+    return column.to_numpy(zero_copy_only=False)
+
+
+def batch_to_numpy(batch, feature_columns):
+    """Stack the feature columns of batch into a 2D float array."""
+    X = np.empty((batch.num_rows, len(feature_columns)), dtype=np.float64)
+    for j, name in enumerate(feature_columns):
+        X[:, j] = _column_to_numpy(batch, name)
+    return X
+
+
+def _columns(feature_columns, target_column, sample_weight_column):
+    columns = list(feature_columns)
+    for name in (target_column, sample_weight_column):
+        if name is not None:
+            columns.append(name)
+    return columns
+
+
+def _take_kept_rows(transformer, method, batch, feature_columns,
+                    sample_weight_column=None, row_offset=0):
+    X = batch_to_numpy(batch, feature_columns)
+    positions = np.arange(batch.num_rows)
+    method = getattr(transformer, method)
+    params = {}
+    if sample_weight_column is not None:
+        params['sample_weight'] = np.asarray(
+            _column_to_numpy(batch, sample_weight_column), dtype=np.float64)
+    if isinstance(transformer, SubSampler):
+        # in nested mode, keys depend on the global row position
+        params['row_offset'] = row_offset
+    outputs = method(X, positions, **params)
+    kept = batch.take(pa.array(outputs[1]))
+    if sample_weight_column is not None:
+        kept = kept.set_column(
+            kept.schema.get_field_index(sample_weight_column),
+            pa.field(sample_weight_column, pa.float64()),
+            pa.array(outputs[2], type=pa.float64()))
+    return kept
+
+
+def transform_pipe_batches(transformer, source, feature_columns,
+                           target_column=None, sample_weight_column=None,
+                           batch_size=65536):
+    """Apply transformer.transform_pipe batch by batch.
+
+    Yields the filtered record batches, with the feature columns, the target
+    column and the sample weight column if given. The sample weights are
+    those returned by the transformer for the kept rows.
+    """
+    columns = _columns(feature_columns, target_column, sample_weight_column)
+    row_offset = 0
+    for batch in iter_record_batches(source, columns, batch_size=batch_size):
+        yield _take_kept_rows(transformer, 'transform_pipe', batch,
+                              feature_columns, sample_weight_column,
+                              row_offset)
+        row_offset += batch.num_rows
+
+
+def fit_pipe_batches(transformer, source, feature_columns,
+                     target_column=None, sample_weight_column=None,
+                     batch_size=65536):
+    """Call transformer.fit_pipe on the rows of source.
+
+    Fitting needs all the rows at once, so the batches are concatenated
+    before fitting; restricting source to a subsample, e.g. with
+    ``transform_pipe_batches(SubSampler(...), ...)``, bounds the memory used.
+    Returns the kept rows as a ``pyarrow.Table``.
+    """
+    columns = _columns(feature_columns, target_column, sample_weight_column)
+    batches = [batch for batch in iter_record_batches(
+        source, columns, batch_size=batch_size) if batch.num_rows]
+    if not batches:
+        raise ValueError("Cannot fit on an empty source")
+    batch = pa.Table.from_batches(batches).combine_chunks().to_batches()[0]
+    return pa.Table.from_batches(
+        [_take_kept_rows(transformer, 'fit_pipe', batch, feature_columns,
+                         sample_weight_column)])
@@ -1,6 +1,11 @@
+import numpy as np
+
 from sklearn.base import BaseEstimator
 from sklearn.covariance import EllipticEnvelope
 
+from validation import (check_n_features, mark_validated, skip_finite_check,
+                        validation_record)
+
 
 class EllipticEnvelopeFilter(BaseEstimator):
 
@@ -12,15 +17,62 @@ class EllipticEnvelopeFilter(BaseEstimator):
         self.contamination = contamination
         self.random_state = random_state
 
-    def fit_pipe(self, X, y=None):
+    def _fit(self, X):
+        check_n_features(self, X, reset=True)
         self.elliptic_envelope_ = EllipticEnvelope(**self.get_params())
-        self.elliptic_envelope_.fit(X)
+        with skip_finite_check(X):
+            self.elliptic_envelope_.fit(X)
+
+    def fit_pipe(self, X, y=None):
+        self._fit(X)
         return self.transform_pipe(X, y)
 
+    def fit_sweep(self, X, y=None, contaminations=(0.1,)):
+        """Fit once, then filter X and y for each contamination value.
+
+        The robust covariance does not depend on the contamination, which
+        only sets the threshold on the Mahalanobis distances. The outputs are
+        those of ``fit_pipe`` with each contamination, at the cost of a
+        single fit. Returns a list of ``(X_out, y_out)``, one per value.
+        """
+        self._fit(X)
+        # Score X again rather than reuse -dist_: the two differ by rounding,
+        # which flips rows lying exactly on a threshold, and fit_pipe uses
+        # the scores of predict. This costs one O(n_samples * n_features**2)
+        # pass, not a refit.
+        return [self._filter(X, y, is_inlier)
+                for is_inlier in self.inlier_masks(X, contaminations)]
+
+    def inlier_masks(self, X, contaminations):
+        """Inlier masks of X, of shape (n_contaminations, n_samples)."""
+        check_n_features(self, X, reset=False)
+        with skip_finite_check(X):
+            scores = self.elliptic_envelope_.score_samples(X)
+        return self._inlier_masks(scores, contaminations)
+
+    def _inlier_masks(self, scores, contaminations):
+        contaminations = np.asarray(contaminations, dtype=np.float64)
+        if np.any((contaminations <= 0) | (contaminations > 0.5)):
+            raise ValueError("contamination must be in (0, 0.5], got %r"
+                             % contaminations)
+        # same thresholds as EllipticEnvelope.fit, from a single sort
+        offsets = np.percentile(-self.elliptic_envelope_.dist_,
+                                100. * contaminations)
+        return scores[np.newaxis, :] >= offsets[:, np.newaxis]
+
     def transform_pipe(self, X, y):
+        check_n_features(self, X, reset=False)
+        with skip_finite_check(X):
+            is_inlier = self.elliptic_envelope_.predict(X) == 1
+        return self._filter(X, y, is_inlier)
+
+    def _filter(self, X, y, is_inlier):
         # XXX: sample_props not taken care off
-        is_inlier = self.elliptic_envelope_.predict(X) == 1
         X_out = X[is_inlier]
+        record = validation_record(X)
+        if record is not None:
+            # a row subset keeps the guarantees checked on X
+            X_out = mark_validated(X_out, record)
         if y is None:
             y_out = None
         else:
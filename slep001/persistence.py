@@ -0,0 +1,95 @@
+"""
+Memory-mappable persistence of fitted filters and pipelines.
+
+``dump`` writes a directory holding two files: ``arrays.bin``, where the
+large numeric arrays (e.g. the location, covariance and precision matrices
+of a fitted ``EllipticEnvelopeFilter``) are laid out contiguously at
+64-byte aligned offsets, and ``metadata.pkl``, a pickle of everything else
+referring to those arrays by offset. ``load`` unpickles the metadata and
+maps the arrays read-only from ``arrays.bin``, so loading does not read the
+arrays and processes loading the same directory share them through the
+page cache.
+"""
+import mmap
+import os
+import pickle
+
+import numpy as np
+
+ALIGNMENT = 64
+METADATA_FILE = 'metadata.pkl'
+ARRAYS_FILE = 'arrays.bin'
+
+
+class _Pickler(pickle.Pickler):
+
+    def __init__(self, file, arrays_file, min_nbytes):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays_file = arrays_file
+        self.min_nbytes = min_nbytes
+        # arrays referenced several times are written once; keeping the
+        # arrays alive ensures their ids are not reused during the dump
+        self.written = {}
+
+    def persistent_id(self, obj):
+        if (type(obj) is not np.ndarray or obj.dtype.hasobject
+                or obj.nbytes < self.min_nbytes):
+            return None
+        if id(obj) in self.written:
+            return self.written[id(obj)][1]
+        order = 'C'
+        if obj.flags.f_contiguous and not obj.flags.c_contiguous:
+            order = 'F'
+        offset = self.arrays_file.tell()
+        padding = -offset % ALIGNMENT
+        self.arrays_file.write(b'\0' * padding)
+        offset += padding
+        self.arrays_file.write(obj.tobytes(order=order))
+        # dtype.str would drop the fields of structured dtypes, e.g. the
+        # nodes of fitted trees
+        pid = ('ndarray', offset, np.lib.format.dtype_to_descr(obj.dtype),
+               obj.shape, order)
+        self.written[id(obj)] = (obj, pid)
+        return pid
+
+
+class _Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, arrays_buffer):
+        super().__init__(file)
+        self.arrays_buffer = arrays_buffer
+
+    def persistent_load(self, pid):
+        kind, offset, dtype, shape, order = pid
+        if kind != 'ndarray':
+            raise pickle.UnpicklingError("Unknown persistent id %r" % kind)
+        dtype = np.lib.format.descr_to_dtype(dtype)
+        count = int(np.prod(shape))
+        array = np.frombuffer(self.arrays_buffer, dtype=dtype, count=count,
+                              offset=offset)
+        return array.reshape(shape, order=order)
+
+
+def dump(obj, path, min_nbytes=4096):
+    """Persist obj in the directory path.
+
+    numpy arrays of at least min_nbytes bytes are stored in the
+    memory-mappable arrays file, smaller ones are pickled along with obj.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ARRAYS_FILE), 'wb') as arrays_file, \
+            open(os.path.join(path, METADATA_FILE), 'wb') as metadata_file:
+        _Pickler(metadata_file, arrays_file, min_nbytes).dump(obj)
+
+
+def load(path):
+    """Load an object written by dump, mapping its large arrays read-only."""
+    with open(os.path.join(path, ARRAYS_FILE), 'rb') as arrays_file:
+        if os.fstat(arrays_file.fileno()).st_size:
+            arrays_buffer = mmap.mmap(arrays_file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+        else:
+            # mmap cannot map an empty file
+            arrays_buffer = b''
+    with open(os.path.join(path, METADATA_FILE), 'rb') as metadata_file:
+        return _Unpickler(metadata_file, arrays_buffer).load()
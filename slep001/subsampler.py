@@ -1,24 +1,128 @@
+import numpy as np
+
 from sklearn.base import BaseEstimator
 from sklearn.utils import check_random_state
 
+from validation import mark_validated, validation_record
+
+
+def _inclusion_probabilities(sample_weight, n_expected):
+    # Poisson sampling proportional to the weights: p = min(1, c * w), with c
+    # such that sum(p) == n_expected. Rows capped at 1 are removed from the
+    # budget until no new row gets capped.
+    p = np.zeros_like(sample_weight, dtype=np.float64)
+    capped = np.zeros(sample_weight.shape, dtype=bool)
+    while True:
+        budget = n_expected - capped.sum()
+        free_weight = sample_weight[~capped].sum()
+        if budget <= 0 or free_weight <= 0:
+            break
+        p = np.where(capped, 1., sample_weight * (budget / free_weight))
+        newly_capped = (p >= 1) & ~capped
+        if not newly_capped.any():
+            break
+        capped |= newly_capped
+    p[capped] = 1.
+    return p
+
+
+def _priority_keys(seed, positions):
+    # splitmix64 of (seed, row position), mapped to [0, 1): a key depends
+    # only on the seed and the global position of the row, not on the
+    # number of rows seen by a given call.
+    with np.errstate(over='ignore'):
+        z = (positions.astype(np.uint64)
+             + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15))
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)) * 2. ** -53
+
 
 class SubSampler(BaseEstimator):
 
-    def __init__(self, ratio=.3, random_state=None):
+    def __init__(self, ratio=.3, random_state=None, weighted=False,
+                 nested=False):
         self.ratio = ratio
         self.random_state = random_state
+        self.weighted = weighted
+        self.nested = nested
         self.random_state_ = None
 
-    def transform_pipe(self, X, y=None):
+    def priority_keys(self, n_samples, row_offset=0):
+        """Priority keys in [0, 1) of n_samples rows from row_offset on.
+
+        In nested mode, a row is kept whenever its key is below ``ratio``.
+        The keys are derived from ``random_state``, which must be an int.
+        """
+        if not isinstance(self.random_state, (int, np.integer)):
+            # a seed drawn here would differ between clones, e.g. between
+            # successive halving rungs, and so would the kept rows
+            raise ValueError("nested=True requires an int random_state, "
+                             "got %r" % (self.random_state,))
+        positions = np.arange(row_offset, row_offset + n_samples)
+        return _priority_keys(int(self.random_state), positions)
+
+    def transform_pipe(self, X, y=None, sample_weight=None, row_offset=0):
+        """Subsample the rows of X and y.
+
+        With ``weighted=True``, rows are kept with probability proportional
+        to ``sample_weight`` (capped at 1), for ``ratio * n_samples`` rows
+        kept in expectation, and the kept rows are reweighted by the inverse
+        of their inclusion probability so that weighted sums stay unbiased.
+
+        With ``nested=True``, each row gets a random priority key derived
+        from ``random_state`` and its global position ``row_offset + i``,
+        and the rows whose key is below ``ratio`` are kept: the output is a
+        prefix of the rows in key order. Increasing ``ratio``, e.g. from one
+        successive halving rung to the next, thus only adds rows, namely
+        those with a key between the previous and the new ratio (see
+        ``priority_keys``). ``random_state`` must be an int, so that every
+        clone draws the same keys. When X arrives in batches, pass the
+        position of the first row of each batch as ``row_offset``.
+
+        When ``sample_weight`` is given, the weights of the kept rows are
+        returned as a third output.
+        """
         # Awkward situation: random_state_ is set at transform time :)
         if self.random_state_ is None:
             self.random_state_ = check_random_state(self.random_state)
         n_samples, _ = X.shape
-        random_choice = self.random_state_.random_sample(n_samples)
-        random_choice = random_choice < self.ratio
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight, dtype=np.float64)
+            if sample_weight.shape != (n_samples,):
+                raise ValueError("sample_weight.shape == %r, expected %r"
+                                 % (sample_weight.shape, (n_samples,)))
+            if np.any(sample_weight < 0):
+                raise ValueError("sample_weight cannot contain negative "
+                                 "values")
+        if self.nested:
+            if self.weighted:
+                raise ValueError("nested=True does not support "
+                                 "weighted=True")
+            random_choice = (self.priority_keys(n_samples, row_offset)
+                             < self.ratio)
+        elif self.weighted:
+            if sample_weight is None:
+                raise ValueError("weighted=True requires sample_weight")
+            inclusion = _inclusion_probabilities(sample_weight,
+                                                 self.ratio * n_samples)
+            random_choice = (self.random_state_.random_sample(n_samples)
+                             < inclusion)
+        else:
+            random_choice = (self.random_state_.random_sample(n_samples)
+                             < self.ratio)
         X_out = X[random_choice]
+        record = validation_record(X)
+        if record is not None:
+            # a row subset keeps the guarantees checked on X
+            X_out = mark_validated(X_out, record)
         y_out = None
         if y is not None:
             y_out = y[random_choice]
-        return X_out, y_out
-
+        if sample_weight is None:
+            return X_out, y_out
+        sample_weight_out = sample_weight[random_choice]
+        if self.weighted:
+            sample_weight_out = sample_weight_out / inclusion[random_choice]
+        return X_out, y_out, sample_weight_out
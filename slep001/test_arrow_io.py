@@ -0,0 +1,75 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from arrow_io import fit_pipe_batches, transform_pipe_batches
+from outlier_filtering import EllipticEnvelopeFilter
+from subsampler import SubSampler
+
+FEATURES = ['a', 'b', 'c']
+
+
+def _write_parquet(tmp_path, n_samples=1000):
+    rng = np.random.RandomState(0)
+    X = rng.randn(n_samples, len(FEATURES))
+    y = rng.randint(0, 2, size=n_samples)
+    sample_weight = rng.randint(1, 5, size=n_samples)
+    columns = {name: X[:, j] for j, name in enumerate(FEATURES)}
+    table = pa.table(dict(columns, target=y, weight=sample_weight))
+    path = tmp_path / 'data.parquet'
+    pq.write_table(table, path)
+    return path, X, y, sample_weight
+
+
+def test_transform_pipe_batches_weighted_round_trip(tmp_path):
+    path, X, y, sample_weight = _write_parquet(tmp_path)
+    batches = list(transform_pipe_batches(
+        SubSampler(ratio=.3, random_state=0, weighted=True), path, FEATURES,
+        target_column='target', sample_weight_column='weight',
+        batch_size=300))
+    out_path = tmp_path / 'subsample.parquet'
+    pq.write_table(pa.Table.from_batches(batches), out_path)
+    result = pq.read_table(out_path)
+
+    # the same transformer applied to the same batches in memory
+    subsampler = SubSampler(ratio=.3, random_state=0, weighted=True)
+    expected = [subsampler.transform_pipe(X[start:start + 300],
+                                          y[start:start + 300],
+                                          sample_weight[start:start + 300])
+                for start in range(0, len(X), 300)]
+    X_out, y_out, weight_out = (np.concatenate(outputs)
+                                for outputs in zip(*expected))
+
+    assert result.schema.field('weight').type == pa.float64()
+    np.testing.assert_array_equal(
+        np.column_stack([result[name].to_numpy() for name in FEATURES]),
+        X_out)
+    np.testing.assert_array_equal(result['target'].to_numpy(), y_out)
+    np.testing.assert_array_equal(result['weight'].to_numpy(), weight_out)
+
+
+def test_fit_pipe_batches_round_trip(tmp_path):
+    path, X, y, _ = _write_parquet(tmp_path)
+    table = fit_pipe_batches(EllipticEnvelopeFilter(random_state=0), path,
+                             FEATURES, target_column='target', batch_size=300)
+    out_path = tmp_path / 'inliers.parquet'
+    pq.write_table(table, out_path)
+    result = pq.read_table(out_path)
+
+    X_out, y_out = EllipticEnvelopeFilter(random_state=0).fit_pipe(X, y)
+    np.testing.assert_array_equal(
+        np.column_stack([result[name].to_numpy() for name in FEATURES]),
+        X_out)
+    np.testing.assert_array_equal(result['target'].to_numpy(), y_out)
+
+
+def test_transform_pipe_batches_nested_matches_in_memory(tmp_path):
+    path, X, y, _ = _write_parquet(tmp_path)
+    batches = transform_pipe_batches(
+        SubSampler(ratio=.3, random_state=0, nested=True), path, FEATURES,
+        target_column='target', batch_size=300)
+    result = pa.Table.from_batches(list(batches))
+
+    _, y_out = SubSampler(ratio=.3, random_state=0,
+                          nested=True).transform_pipe(X, y)
+    np.testing.assert_array_equal(result['target'].to_numpy(), y_out)
@@ -0,0 +1,16 @@
+import numpy as np
+
+from outlier_filtering import EllipticEnvelopeFilter
+
+
+def test_fit_sweep_matches_fit_pipe():
+    contaminations = np.linspace(0.01, 0.5, 20)
+    for seed in range(5):
+        X = np.random.RandomState(seed).randn(201, 4)
+        y = np.arange(len(X))
+        outputs = EllipticEnvelopeFilter(random_state=0).fit_sweep(
+            X, y, contaminations)
+        for contamination, (_, y_out) in zip(contaminations, outputs):
+            filtering = EllipticEnvelopeFilter(contamination=contamination,
+                                               random_state=0)
+            np.testing.assert_array_equal(filtering.fit_pipe(X, y)[1], y_out)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from outlier_filtering import EllipticEnvelopeFilter
+from persistence import dump, load
+
+
+def test_round_trip_filter(tmp_path):
+    X = np.random.RandomState(0).rand(500, 20)
+    filtering = EllipticEnvelopeFilter(random_state=0)
+    X_out, _ = filtering.fit_pipe(X)
+
+    dump(filtering, tmp_path, min_nbytes=256)
+    loaded = load(tmp_path)
+
+    precision = loaded.elliptic_envelope_.precision_
+    assert not precision.flags.writeable
+    np.testing.assert_array_equal(loaded.transform_pipe(X, None)[0], X_out)
+
+
+def test_round_trip_pipeline_with_tree_model(tmp_path):
+    # tree nodes are stored in an array of structured dtype
+    rng = np.random.RandomState(0)
+    X = rng.rand(300, 5)
+    y = rng.randint(0, 2, size=300)
+    pipe = make_pipeline(StandardScaler(),
+                         RandomForestClassifier(n_estimators=5,
+                                                random_state=0)).fit(X, y)
+
+    dump(pipe, tmp_path, min_nbytes=256)
+    loaded = load(tmp_path)
+
+    np.testing.assert_array_equal(loaded.predict_proba(X),
+                                  pipe.predict_proba(X))
+
+
+class _FreshState:
+    # The state array is built on the fly, so pickle does not keep it alive
+
+    def __init__(self, k):
+        self.k = k
+
+    def __reduce__(self):
+        return _FreshState, (None,), np.full(1000, self.k)
+
+    def __setstate__(self, state):
+        self.k = int(state[0])
+
+
+def test_round_trip_arrays_freed_during_dump(tmp_path):
+    dump([_FreshState(k) for k in range(5)], tmp_path, min_nbytes=256)
+    assert [obj.k for obj in load(tmp_path)] == [0, 1, 2, 3, 4]
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from sklearn.base import clone
+
+from subsampler import SubSampler
+
+
+def test_nested_rungs_only_add_rows():
+    X = np.random.RandomState(0).randn(1000, 2)
+    y = np.arange(len(X))
+    subsampler = SubSampler(random_state=0, nested=True)
+    _, y_small = clone(subsampler).set_params(ratio=.2).transform_pipe(X, y)
+    _, y_large = clone(subsampler).set_params(ratio=.5).transform_pipe(X, y)
+    assert np.isin(y_small, y_large).all()
+    assert len(y_small) < len(y_large)
+
+
+def test_nested_requires_int_random_state():
+    X = np.zeros((10, 2))
+    for random_state in (None, np.random.RandomState(0)):
+        subsampler = SubSampler(random_state=random_state, nested=True)
+        with pytest.raises(ValueError, match='int random_state'):
+            subsampler.transform_pipe(X)
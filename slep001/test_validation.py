@@ -0,0 +1,21 @@
+import numpy as np
+
+from validation import check_array_once, validation_record
+
+
+def test_record_follows_array():
+    X = check_array_once(np.arange(12).reshape(6, 2))
+    record = validation_record(X)
+    assert record == (np.float64, 2, True)
+    assert validation_record(X[::2]) is None
+
+
+def test_record_ignored_after_in_place_reinterpretation():
+    X = check_array_once(np.random.RandomState(0).rand(6, 4))
+    X.shape = (12, 2)
+    assert validation_record(X) is None
+    X.shape = (6, 4)
+    X.dtype = np.int64
+    assert validation_record(X) is None
+    # the int view is converted and checked again
+    assert check_array_once(X).dtype == np.float64
@@ -0,0 +1,91 @@
+"""
+Opt-in validate-once input checks for chains of resampling transformers.
+
+``check_array_once`` validates X and attaches a ``ValidationRecord`` to the
+array it returns. The transformers of this directory recognize such marked
+arrays: they skip the finiteness scan of the underlying scikit-learn
+estimator, only compare ``n_features_in_`` (SLEP010), and mark the row
+subsets they output with the same record. Unmarked inputs are processed
+exactly as before.
+
+As with ``check_input=False`` in scikit-learn, writing non-finite values to
+a marked array voids the guarantees of its record. A record also records
+the dtype and number of features of the array, and is ignored once they no
+longer match, e.g. after assigning ``X.shape`` or ``X.dtype`` in place.
+"""
+import weakref
+from collections import namedtuple
+from contextlib import nullcontext
+
+import numpy as np
+
+from sklearn import config_context
+
+ValidationRecord = namedtuple('ValidationRecord',
+                              ['dtype', 'n_features', 'all_finite'])
+
+# id(array) -> ValidationRecord, entries are removed when the array dies
+_records = {}
+
+
+def validation_record(X):
+    """Return the ValidationRecord attached to X, or None."""
+    record = _records.get(id(X))
+    if record is None:
+        return None
+    if (X.dtype != record.dtype or X.ndim != 2
+            or X.shape[1] != record.n_features):
+        # X was reinterpreted in place since it was checked
+        return None
+    return record
+
+
+def mark_validated(X, record):
+    """Attach record to the array X and return X."""
+    key = id(X)
+    if key not in _records:
+        weakref.finalize(X, _records.pop, key, None)
+    _records[key] = record
+    return X
+
+
+def check_array_once(X, ensure_all_finite=True):
+    """Validate a 2D float array, unless X carries a sufficient record.
+
+    Returns X, converted to float64 if it was not a float array, marked
+    with its ValidationRecord.
+    """
+    record = validation_record(X)
+    if record is not None and (record.all_finite or not ensure_all_finite):
+        return X
+
+    X = np.asanyarray(X)
+    if X.ndim != 2:
+        raise ValueError("Expected 2D array, got %dD array instead"
+                         % X.ndim)
+    if X.dtype.kind != 'f':
+        X = X.astype(np.float64)
+    if ensure_all_finite and not np.isfinite(X).all():
+        raise ValueError("Input contains NaN or infinity.")
+    return mark_validated(X, ValidationRecord(X.dtype, X.shape[1],
+                                              ensure_all_finite))
+
+
+def skip_finite_check(X):
+    """Context skipping scikit-learn's finiteness scan if X is marked so."""
+    record = validation_record(X)
+    if record is not None and record.all_finite:
+        return config_context(assume_finite=True)
+    return nullcontext()
+
+
+def check_n_features(estimator, X, reset):
+    """Set (reset=True) or check n_features_in_ as described in SLEP010."""
+    n_features = X.shape[1]
+    if reset:
+        estimator.n_features_in_ = n_features
+    elif n_features != estimator.n_features_in_:
+        raise ValueError("X has %d features, but %s is expecting %d features "
+                         "as input." % (n_features,
+                                        estimator.__class__.__name__,
+                                        estimator.n_features_in_))
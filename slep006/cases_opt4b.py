@@ -1,7 +1,9 @@
 from defs import (accuracy_score, GroupKFold, make_scorer, SelectKBest,
                   LogisticRegressionCV, cross_validate,
-                  make_pipeline, X, y, my_groups, my_weights,
-                  my_other_weights)
+                  make_pipeline, roc_auc_score, X, y, my_groups,
+                  my_weights, my_other_weights)
+from group_index import GroupIndex, IndexedGroupKFold
+from multi_scorer import Metric, MultiMetricScorer
 
 # %%
 # Case A: weighted scoring and fitting
@@ -93,3 +95,47 @@ cross_validate(lr, X, y, cv=group_cv,
                    'groups': my_groups,
                },
                scoring=weighted_acc)
+
+# %%
+# Case E: precomputed group index shared by the outer and inner CV
+
+# GroupIndex behaves like sample-aligned metadata, so the outer CV slices it
+# for each fold like any other array, and the inner splitter reuses the
+# sorted unique groups and group rows rather than recomputing them.
+
+indexed_group_cv = IndexedGroupKFold()
+lr = LogisticRegressionCV(
+    cv=indexed_group_cv,
+    scoring=weighted_acc,
+).request_sample_weight(fit='fitting_weight')
+cross_validate(lr, X, y, cv=indexed_group_cv,
+               metadata={
+                   'scoring_weight': my_weights,
+                   'fitting_weight': my_other_weights,
+                   'groups': GroupIndex(my_groups),
+               },
+               scoring=weighted_acc)
+
+# %%
+# Case F: several weighted metrics evaluated from one prediction pass
+
+# Each metric declares its response method and its metadata like make_scorer.
+# The scorer calls predict and predict_proba once per fold, whatever the
+# number of metrics, and resolves each weight alias once.
+
+multi_scorer = MultiMetricScorer({
+    'weighted_acc': Metric(accuracy_score,
+                           request_metadata={'scoring_weight':
+                                             'sample_weight'}),
+    'acc': Metric(accuracy_score),
+    'weighted_auc': Metric(roc_auc_score, response_method='predict_proba',
+                           request_metadata={'scoring_weight':
+                                             'sample_weight'}),
+})
+cross_validate(lr, X, y, cv=group_cv,
+               metadata={
+                   'scoring_weight': my_weights,
+                   'fitting_weight': my_other_weights,
+                   'groups': my_groups,
+               },
+               scoring=multi_scorer)
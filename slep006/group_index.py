@@ -0,0 +1,141 @@
+"""
+Group index shared between nested group-aware splitters.
+
+``GroupIndex`` is built once from the ``groups`` metadata passed to
+``cross_validate``. It has a ``shape`` and supports the ``X[indices, ...]``
+indexing of ``sklearn.utils._safe_indexing``, so metadata routing slices it
+for each outer fold as it would slice ``groups`` itself, and the inner
+splitter consumes the slice without recomputing the unique groups or the
+group-to-row mapping.
+"""
+import numpy as np
+
+from sklearn.model_selection import BaseCrossValidator
+from sklearn.model_selection._split import GroupsConsumerMixin
+
+
+class GroupIndex:
+    """Sorted unique groups, group sizes and per-row group codes.
+
+    The rows of each group are also available in CSR layout: the rows of
+    group ``unique_groups[k]`` are ``indices[indptr[k]:indptr[k + 1]]``, in
+    increasing order. These are only computed when first accessed, since
+    splitting only needs the codes and the group sizes.
+    """
+
+    def __init__(self, groups):
+        groups = np.asarray(groups)
+        self.unique_groups, codes = np.unique(groups, return_inverse=True)
+        self._set_codes(codes.ravel(),
+                        np.bincount(codes.ravel(),
+                                    minlength=len(self.unique_groups)))
+
+    def _set_codes(self, codes, group_sizes):
+        self.codes = codes
+        self.group_sizes = group_sizes
+        self._indptr = None
+        self._indices = None
+
+    @classmethod
+    def _from_codes(cls, unique_groups, codes):
+        # Drop the groups absent from codes and renumber the remaining ones.
+        counts = np.bincount(codes, minlength=len(unique_groups))
+        present = counts > 0
+        recode = np.cumsum(present) - 1
+        self = cls.__new__(cls)
+        self.unique_groups = unique_groups[present]
+        self._set_codes(recode[codes], counts[present])
+        return self
+
+    @property
+    def n_groups(self):
+        return len(self.unique_groups)
+
+    @property
+    def indptr(self):
+        if self._indptr is None:
+            self._indptr = np.zeros(self.n_groups + 1, dtype=np.intp)
+            np.cumsum(self.group_sizes, out=self._indptr[1:])
+        return self._indptr
+
+    @property
+    def indices(self):
+        if self._indices is None:
+            self._indices = np.argsort(self.codes, kind='stable')
+        return self._indices
+
+    def rows(self, k):
+        return self.indices[self.indptr[k]:self.indptr[k + 1]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def shape(self):
+        return (len(self.codes),)
+
+    @property
+    def nbytes(self):
+        return (self.codes.nbytes + self.unique_groups.nbytes
+                + self.group_sizes.nbytes)
+
+    def __getitem__(self, item):
+        if isinstance(item, tuple):
+            # _safe_indexing selects rows with X[indices, ...]
+            if len(item) != 2 or item[1] is not Ellipsis:
+                raise IndexError("GroupIndex is one-dimensional")
+            item = item[0]
+        codes = self.codes[item]
+        if np.ndim(codes) != 1:
+            raise IndexError("GroupIndex can only be indexed by a slice, an "
+                             "array of indices or a boolean mask, got %r"
+                             % (item,))
+        # Slicing for an outer fold only touches the per-row group codes.
+        return self._from_codes(self.unique_groups, codes)
+
+    def __array__(self, dtype=None, copy=None):
+        # Consumers that do not know about GroupIndex see the plain labels.
+        return np.asarray(self.unique_groups[self.codes], dtype=dtype)
+
+
+class IndexedGroupKFold(GroupsConsumerMixin, BaseCrossValidator):
+    """GroupKFold splitting from a precomputed :class:`GroupIndex`.
+
+    Folds are assigned exactly as in ``sklearn.model_selection.GroupKFold``:
+    the largest groups are placed first, each into the currently lightest
+    fold. ``groups`` may also be a plain array, in which case the index is
+    built on the fly.
+    """
+
+    def __init__(self, n_splits=5):
+        self.n_splits = n_splits
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        return self.n_splits
+
+    def split(self, X, y=None, groups=None):
+        if groups is None:
+            raise ValueError("The 'groups' parameter should not be None.")
+        if not isinstance(groups, GroupIndex):
+            groups = GroupIndex(groups)
+        if self.n_splits > groups.n_groups:
+            raise ValueError("Cannot have number of splits n_splits=%d greater"
+                             " than the number of groups: %d."
+                             % (self.n_splits, groups.n_groups))
+
+        sizes = groups.group_sizes
+        order = np.argsort(sizes, kind='stable')[::-1]
+        group_to_fold = [0] * groups.n_groups
+        # plain Python scalars: this loop runs once per group
+        n_samples_per_fold = [0] * self.n_splits
+        folds = range(self.n_splits)
+        for k, size in zip(order.tolist(), sizes[order].tolist()):
+            lightest_fold = min(folds, key=n_samples_per_fold.__getitem__)
+            n_samples_per_fold[lightest_fold] += size
+            group_to_fold[k] = lightest_fold
+
+        row_fold = np.asarray(group_to_fold, dtype=np.intp)[groups.codes]
+        all_rows = np.arange(len(groups))
+        for fold in range(self.n_splits):
+            is_test = row_fold == fold
+            yield all_rows[~is_test], all_rows[is_test]
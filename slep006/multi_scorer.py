@@ -0,0 +1,77 @@
+"""
+Evaluating several metadata-requesting metrics in one pass.
+
+Each scorer made with ``make_scorer(..., request_metadata=...)`` calls the
+estimator's prediction method itself. ``MultiMetricScorer`` instead calls each
+required response method (``predict``, ``predict_proba``, ...) once per
+evaluation, resolves every requested metadata alias once, and passes these
+shared arrays to all metrics.
+"""
+import numpy as np
+
+from routing_trace import route_metadata
+
+
+class Metric:
+    """A metric function together with what it consumes.
+
+    ``request_metadata`` follows ``make_scorer`` in ``cases_opt4b.py``: either
+    a list of metadata keys, or a dict mapping the key passed by the user to
+    the parameter name expected by ``score_func``, e.g.
+    ``{'scoring_weight': 'sample_weight'}``.
+    """
+
+    def __init__(self, score_func, response_method='predict',
+                 request_metadata=None, greater_is_better=True, **kwargs):
+        self.score_func = score_func
+        self.response_method = response_method
+        if request_metadata is None:
+            request_metadata = {}
+        elif not isinstance(request_metadata, dict):
+            request_metadata = {key: key for key in request_metadata}
+        self.request_metadata = request_metadata
+        self.sign = 1 if greater_is_better else -1
+        self.kwargs = kwargs
+
+
+class MultiMetricScorer:
+    """Score an estimator with several :class:`Metric` objects at once.
+
+    Calling the scorer returns a dict mapping each metric name to its score,
+    so it can be passed as ``scoring`` wherever a multimetric callable is
+    accepted.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def get_metadata_request(self):
+        return {'score': {key
+                          for metric in self.metrics.values()
+                          for key in metric.request_metadata}}
+
+    def __call__(self, estimator, X, y, **metadata):
+        unexpected = set(metadata) - self.get_metadata_request()['score']
+        if unexpected:
+            raise TypeError("Unexpected metadata passed to scorer: %s"
+                            % sorted(unexpected))
+
+        responses = {}
+        for metric in self.metrics.values():
+            method = metric.response_method
+            if method not in responses:
+                responses[method] = getattr(estimator, method)(X)
+
+        routed = {key: np.asarray(value) for key, value in metadata.items()}
+
+        scores = {}
+        for name, metric in self.metrics.items():
+            params = route_metadata(routed, metric.request_metadata,
+                                    consumer=name, method='score')
+            y_pred = responses[metric.response_method]
+            if y_pred.ndim == 2 and y_pred.shape[1] == 2:
+                # binary probabilities: keep those of the positive class
+                y_pred = y_pred[:, 1]
+            scores[name] = metric.sign * metric.score_func(
+                y, y_pred, **params, **metric.kwargs)
+        return scores
@@ -0,0 +1,260 @@
+"""
+Opt-in tracing of metadata routing.
+
+Routers call ``route_metadata`` to select, rename and slice the metadata a
+consumer requested. Outside of a ``trace_routing()`` block this is all it
+does. Inside, each routed key is recorded with its alias, consumer, method,
+fold, whether a copy was made and of how many bytes, and the time spent, so
+that duplicated or unused metadata can be spotted.
+
+Within the block, the routing done by scikit-learn itself is recorded as
+well: ``process_routing``, which dispatches the metadata to the children of
+a router, and ``_check_method_params``, which slices it to the rows of a
+fold, e.g. in ``cross_validate`` or ``GridSearchCV``. The consumer of a
+slice is the child the sliced parameters were routed to; its fold numbers
+the distinct index arrays seen, so that a fit on the training rows and a
+score on the same rows share a fold. Only the calls made in this process
+are seen, i.e. with ``n_jobs=None`` or a threading backend::
+
+    with trace_routing() as tracer:
+        cross_validate(lr, X, y, cv=group_cv, scoring=multi_scorer,
+                       params=metadata)
+    print(tracer.summary())
+    print(tracer.duplicated())
+    print(tracer.unused(metadata))
+    print(tracer.to_dot())
+"""
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+import sys
+from time import perf_counter
+
+import numpy as np
+from sklearn.utils import metadata_routing, validation
+
+# nbytes is the size of the copy made for the consumer, 0 when the consumer
+# gets the caller's object, or a view of it.
+RoutingRecord = namedtuple('RoutingRecord',
+                           ['key', 'alias', 'consumer', 'method', 'fold',
+                            'copied', 'nbytes', 'seconds'])
+
+_tracer = None
+
+
+def _normalize_request(request):
+    # request as accepted by make_scorer(request_metadata=...):
+    # a list of keys or a dict mapping user keys to parameter names.
+    if isinstance(request, dict):
+        return request
+    return {key: key for key in request}
+
+
+def route_metadata(metadata, request, consumer, method, fold=None,
+                   indices=None):
+    """Return the parameters for consumer.method from metadata.
+
+    Only the requested keys present in metadata are routed; they are renamed
+    following request and, if indices is given, restricted to those rows.
+    """
+    params = {}
+    for key, alias in _normalize_request(request).items():
+        if key not in metadata:
+            continue
+        tic = perf_counter()
+        value = original = metadata[key]
+        if indices is not None:
+            value = value[indices]
+        params[alias] = value
+        if _tracer is not None:
+            _tracer._record(key, alias, consumer, method, fold, value,
+                            original, perf_counter() - tic)
+    return params
+
+
+def _is_copy(value, original):
+    if value is original:
+        return False
+    if isinstance(value, np.ndarray) and isinstance(original, np.ndarray):
+        return not np.may_share_memory(value, original)
+    return True
+
+
+def _nbytes(value):
+    # e.g. a GroupIndex reports the size of its codes, without materializing
+    # its labels
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is None:
+        nbytes = np.asarray(value).nbytes
+    return nbytes
+
+
+_process_routing = metadata_routing.process_routing
+_check_method_params = validation._check_method_params
+
+
+def _traced_process_routing(_obj, _method, /, **kwargs):
+    routed = _process_routing(_obj, _method, **kwargs)
+    if not kwargs:
+        return routed
+    for key, value in kwargs.items():
+        _tracer._add_key(key, value)
+    owner = getattr(_obj, 'owner', None) or type(_obj).__name__
+    for child, methods in routed.items():
+        for method, params in methods.items():
+            if not params:
+                continue
+            consumer = '%s.%s' % (owner, child)
+            _tracer._routes[id(params)] = params, consumer, method
+            for alias, value in params.items():
+                _tracer._record(_tracer._key(alias, value), alias, consumer,
+                                method, None, value, value, 0.)
+    return routed
+
+
+def _traced_check_method_params(X, params, indices=None):
+    route = _tracer._routes.get(id(params))
+    if route is not None and route[0] is params:
+        consumer, method = route[1:]
+    else:
+        consumer, method = '?', '?'
+    fold = None if indices is None else _tracer._fold(indices)
+    checked = {}
+    for alias, value in params.items():
+        tic = perf_counter()
+        checked.update(_check_method_params(X, {alias: value}, indices))
+        _tracer._record(_tracer._key(alias, value), alias, consumer, method,
+                        fold, checked[alias], value, perf_counter() - tic)
+    return checked
+
+
+_HOOKS = [(_process_routing, _traced_process_routing),
+          (_check_method_params, _traced_check_method_params)]
+
+
+def _patch_sklearn(hooks):
+    # The functions are imported by name in each module using them, so each
+    # binding is replaced.
+    for module in list(sys.modules.values()):
+        if not getattr(module, '__name__', '').startswith('sklearn'):
+            continue
+        for name, value in list(vars(module).items()):
+            for function, replacement in hooks:
+                if value is function:
+                    setattr(module, name, replacement)
+
+
+class RoutingTracer:
+    """Collects a RoutingRecord for each routed key."""
+
+    def __init__(self):
+        self.records = []
+        # the values are kept alive, so that their ids are not reused
+        self._routes = {}
+        self._folds = {}
+        self._keys = {}
+
+    def _record(self, key, alias, consumer, method, fold, value, original,
+                seconds):
+        copied = _is_copy(value, original)
+        self.records.append(RoutingRecord(
+            key, alias, consumer, method, fold, copied,
+            _nbytes(value) if copied else 0, seconds))
+
+    def _add_key(self, key, value):
+        # the outermost router sees the keys of the caller, the nested ones
+        # the aliases of their parent
+        known = self._keys.get(id(value))
+        if known is None or known[0] is not value:
+            self._keys[id(value)] = value, key
+
+    def _key(self, alias, value):
+        known = self._keys.get(id(value))
+        if known is not None and known[0] is value:
+            return known[1]
+        return alias
+
+    def _fold(self, indices):
+        known = self._folds.get(id(indices))
+        if known is None or known[0] is not indices:
+            known = self._folds[id(indices)] = indices, len(self._folds)
+        return known[1]
+
+    def summary(self):
+        """Table of the routes, aggregated over folds."""
+        totals = defaultdict(lambda: [0, 0, 0, 0.])
+        for record in self.records:
+            total = totals[record.key, record.alias, record.consumer,
+                           record.method]
+            total[0] += 1
+            total[1] += record.copied
+            total[2] += record.nbytes
+            total[3] += record.seconds
+
+        header = ('key', 'alias', 'consumer', 'method', 'calls', 'copies',
+                  'bytes copied', 'ms')
+        rows = [header] + [
+            (key, alias, consumer, method, str(calls), str(copies),
+             str(nbytes), '%.3f' % (seconds * 1e3))
+            for (key, alias, consumer, method), (calls, copies, nbytes,
+                                                  seconds)
+            in sorted(totals.items())]
+        widths = [max(len(row[i]) for row in rows)
+                  for i in range(len(header))]
+        lines = ['  '.join(cell.ljust(width)
+                           for cell, width in zip(row, widths))
+                 for row in rows]
+        return '\n'.join(line.rstrip() for line in lines)
+
+    def duplicated(self):
+        """Map each (key, fold) copied for several consumers to them.
+
+        Consumers sharing the caller's array, or a view of it, are not
+        duplicates.
+        """
+        consumers = defaultdict(list)
+        for record in self.records:
+            if record.copied:
+                consumers[record.key, record.fold].append(
+                    (record.consumer, record.method))
+        return {route: sorted(targets)
+                for route, targets in consumers.items() if len(targets) > 1}
+
+    def unused(self, metadata):
+        """Keys of metadata which were never routed."""
+        routed = {record.key for record in self.records}
+        return sorted(set(metadata) - routed)
+
+    def to_dot(self):
+        """The routing graph in Graphviz dot format."""
+        edges = defaultdict(int)
+        for record in self.records:
+            edges[record.key, record.alias,
+                  '%s.%s' % (record.consumer, record.method)] += record.nbytes
+        lines = ['digraph routing {']
+        for (key, alias, target), nbytes in sorted(edges.items()):
+            label = '%d bytes copied' % nbytes if nbytes else 'shared'
+            if alias != key:
+                label = 'as %s, %s' % (alias, label)
+            lines.append('    "%s" -> "%s" [label="%s"];'
+                         % (key, target, label))
+        lines.append('}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def trace_routing():
+    """Record the routing done within the block.
+
+    Both the calls to route_metadata and the routing done by scikit-learn
+    are recorded.
+    """
+    global _tracer
+    previous, _tracer = _tracer, RoutingTracer()
+    if previous is None:
+        _patch_sklearn(_HOOKS)
+    try:
+        yield _tracer
+    finally:
+        _tracer = previous
+        if previous is None:
+            _patch_sklearn([(new, old) for old, new in _HOOKS])
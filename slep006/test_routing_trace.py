@@ -0,0 +1,45 @@
+import numpy as np
+
+from sklearn import config_context
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, make_scorer
+from sklearn.model_selection import cross_validate
+
+from group_index import GroupIndex, IndexedGroupKFold
+from routing_trace import trace_routing
+
+
+def test_trace_cross_validate():
+    rng = np.random.RandomState(0)
+    X = rng.randn(300, 4)
+    y = rng.randint(0, 2, size=300)
+    groups = GroupIndex(np.array(['group %d' % i
+                                  for i in rng.randint(0, 30, size=300)]))
+    weight = rng.rand(300)
+    metadata = {'groups': groups, 'weight': weight, 'unused': weight}
+
+    with config_context(enable_metadata_routing=True):
+        lr = LogisticRegression().set_fit_request(sample_weight='weight')
+        scorer = make_scorer(accuracy_score).set_score_request(
+            sample_weight='weight')
+        with trace_routing() as tracer:
+            cross_validate(lr, X, y, cv=IndexedGroupKFold(3), scoring=scorer,
+                           params={'groups': groups, 'weight': weight})
+
+    routes = {(record.key, record.consumer, record.method)
+              for record in tracer.records}
+    assert routes == {('groups', 'cross_validate.splitter', 'split'),
+                      ('weight', 'cross_validate.estimator', 'fit'),
+                      ('weight', 'cross_validate.scorer', 'score')}
+    assert tracer.unused(metadata) == ['unused']
+    # the fit and the score on the training rows of a fold copy the same rows
+    duplicated = tracer.duplicated()
+    assert len(duplicated) == 3
+    assert all(consumers == [('cross_validate.estimator', 'fit'),
+                             ('cross_validate.scorer', 'score')]
+               for consumers in duplicated.values())
+    fit_copies = [record for record in tracer.records
+                  if record.method == 'fit' and record.copied]
+    assert all(record.alias == 'sample_weight' for record in fit_copies)
+    # each training set is a copy of 2/3 of the weights
+    assert sum(record.nbytes for record in fit_copies) == 2 * weight.nbytes
@@ -0,0 +1,147 @@
+"""
+Compact, lazily materialized output feature names.
+
+With millions of output features, building the object array returned by
+``get_feature_names_out`` at every stage is costly. The classes below
+describe the names instead of storing them:
+
+- ``RangeNames('x', n)`` for ``x0, ..., x{n-1}``, e.g. hashed features;
+- ``PrefixedNames('cat', names)`` for ``cat__<name>``, as added by
+  ``ColumnTransformer``, or ``PrefixedNames('sex', categories, sep='_')``
+  for the categories of a one-hot encoded feature;
+- ``ConcatenatedNames([names, ...])`` for the outputs of several
+  transformers stacked side by side.
+
+They have O(1) ``len``, and an integer index builds a single name:
+O(1) for ranges and prefixes, plus a binary search over the parts of a
+concatenation. ``np.asarray(names)`` materializes the object array expected
+by SLEP007 the first time only; an estimator storing the compact names as a
+fitted attribute and returning it from ``get_feature_names_out`` hence pays
+for the materialization at most once, and only if it is asked for.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+
+def _object_array(names):
+    # Materialize names without caching the arrays of nested FeatureNames,
+    # which would only duplicate the memory of the enclosing array.
+    if isinstance(names, FeatureNames):
+        if names._array is not None:
+            return names._array
+        return names._materialize()
+    return np.asarray(names).astype(str).astype(object)
+
+
+class FeatureNames:
+    """Base class: a read-only sequence of str, materialized on demand."""
+
+    __slots__ = ('_array',)
+
+    def __init__(self):
+        self._array = None
+
+    def _name(self, i):
+        raise NotImplementedError
+
+    def _materialize(self):
+        return np.array([self._name(i) for i in range(len(self))],
+                        dtype=object)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            n = len(self)
+            if not -n <= item < n:
+                raise IndexError("feature name index %d out of range" % item)
+            return self._name(int(item) % n)
+        return np.asarray(self)[item]
+
+    def __iter__(self):
+        if self._array is not None:
+            return iter(self._array)
+        return (self._name(i) for i in range(len(self)))
+
+    def __array__(self, dtype=None, copy=None):
+        if self._array is None:
+            self._array = self._materialize()
+            # the cache must agree with the names built one at a time
+            self._array.flags.writeable = False
+        if dtype is not None and dtype != object:
+            return self._array.astype(dtype)
+        return self._array.copy() if copy else self._array
+
+    def __repr__(self):
+        n = len(self)
+        if n <= 6:
+            shown = ', '.join(repr(name) for name in self)
+        else:
+            shown = ', '.join([repr(self[i]) for i in range(3)] + ['...']
+                              + [repr(self[i]) for i in range(n - 2, n)])
+        return '%s([%s], n=%d)' % (self.__class__.__name__, shown, n)
+
+
+class RangeNames(FeatureNames):
+    """``prefix + str(i)`` for i in ``range(n)``."""
+
+    __slots__ = ('prefix', 'n')
+
+    def __init__(self, prefix, n):
+        super().__init__()
+        self.prefix = prefix
+        self.n = n
+
+    def __len__(self):
+        return self.n
+
+    def _name(self, i):
+        return '%s%d' % (self.prefix, i)
+
+
+class PrefixedNames(FeatureNames):
+    """``prefix + sep + name`` for each name of names.
+
+    ``names`` may itself be a FeatureNames, which is then not materialized.
+    """
+
+    __slots__ = ('prefix', 'names', 'sep')
+
+    def __init__(self, prefix, names, sep='__'):
+        super().__init__()
+        self.prefix = prefix
+        self.names = names
+        self.sep = sep
+
+    def __len__(self):
+        return len(self.names)
+
+    def _name(self, i):
+        return '%s%s%s' % (self.prefix, self.sep, self.names[i])
+
+    def _materialize(self):
+        # one vectorized concatenation instead of a Python loop
+        return (self.prefix + self.sep) + _object_array(self.names)
+
+
+class ConcatenatedNames(FeatureNames):
+    """The names of each part, one part after the other."""
+
+    __slots__ = ('parts', '_ends')
+
+    def __init__(self, parts):
+        super().__init__()
+        self.parts = list(parts)
+        self._ends = np.cumsum([len(part) for part in self.parts]).tolist()
+
+    def __len__(self):
+        return self._ends[-1] if self._ends else 0
+
+    def _name(self, i):
+        k = bisect_right(self._ends, i)
+        start = self._ends[k - 1] if k else 0
+        return self.parts[k][i - start]
+
+    def _materialize(self):
+        if not self.parts:
+            return np.array([], dtype=object)
+        return np.concatenate([_object_array(part) for part in self.parts])
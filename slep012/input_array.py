@@ -0,0 +1,146 @@
+"""
+A minimal ``InputArray``: an ``ndarray`` subclass carrying feature names.
+
+The meta-data lives in ``__slots__``, so an ``InputArray`` costs no more than
+the ndarray header plus two references. Unlike what the SLEP proposes,
+``__getitem__`` is overloaded so that row selections (as done by the
+``SubSampler`` and ``EllipticEnvelopeFilter`` of SLEP001) keep the feature
+names, which are shared rather than copied, and slice the sample-aligned
+meta-data along with the rows. Basic slicing still returns views, and
+element-wise ufuncs return an ``InputArray`` with the same meta-data.
+
+Meta-data is only kept by the operations known to preserve the meaning of
+rows and columns: indexing, element-wise ufuncs, ``copy`` and ``astype``.
+Any other operation, e.g. ``X @ W``, a reduction, ``np.sort`` or
+``np.take``, returns an ``InputArray`` without meta-data or a plain ndarray.
+"""
+import numpy as np
+
+
+def _plain(x):
+    if isinstance(x, InputArray):
+        return x.view(np.ndarray)
+    if isinstance(x, (list, tuple)):
+        return type(x)(_plain(item) for item in x)
+    if isinstance(x, dict):
+        return {key: _plain(value) for key, value in x.items()}
+    return x
+
+
+class InputArray(np.ndarray):
+    """2D array with ``feature_names`` and sample-aligned ``sample_props``.
+
+    ``feature_names`` is an object ndarray aligned with the columns, or
+    None. ``sample_props`` is a dict of arrays aligned with the rows, or
+    None.
+    """
+
+    __slots__ = ('feature_names', 'sample_props')
+
+    def __new__(cls, data, feature_names=None, sample_props=None):
+        obj = np.asarray(data).view(cls)
+        if feature_names is not None:
+            feature_names = np.asarray(feature_names, dtype=object)
+            if obj.ndim != 2 or feature_names.shape != (obj.shape[1],):
+                raise ValueError("feature_names must have one entry per "
+                                 "column of a 2D array")
+        if sample_props is not None:
+            sample_props = {key: np.asarray(value)
+                            for key, value in sample_props.items()}
+            for key, value in sample_props.items():
+                if len(value) != len(obj):
+                    raise ValueError("sample_props[%r] has %d entries, "
+                                     "expected %d"
+                                     % (key, len(value), len(obj)))
+        obj.feature_names = feature_names
+        obj.sample_props = sample_props
+        return obj
+
+    def __array_finalize__(self, obj):
+        # meta-data is set explicitly by the operations which preserve it
+        self.feature_names = None
+        self.sample_props = None
+
+    def _with_metadata_of(self, other):
+        self.feature_names = other.feature_names
+        self.sample_props = other.sample_props
+        return self
+
+    def __array_ufunc__(self, ufunc, method, *inputs, out=None, **kwargs):
+        if out is not None:
+            kwargs['out'] = _plain(out)
+        result = getattr(ufunc, method)(*_plain(inputs), **kwargs)
+        if out is not None:
+            return out[0] if len(out) == 1 else out
+        if method != '__call__' or ufunc.signature is not None:
+            # reductions, accumulations and e.g. matmul mix rows or columns
+            return result
+
+        def wrap(array):
+            if not isinstance(array, np.ndarray):
+                return array
+            for x in inputs:
+                if isinstance(x, InputArray) and x.shape == array.shape:
+                    return array.view(InputArray)._with_metadata_of(x)
+            return array
+
+        if isinstance(result, tuple):
+            return tuple(wrap(array) for array in result)
+        return wrap(result)
+
+    def __array_function__(self, func, types, args, kwargs):
+        # e.g. np.sort or np.take: the result has no meta-data
+        return func(*_plain(args), **_plain(kwargs))
+
+    def __getitem__(self, key):
+        result = super().__getitem__(key)
+        if not isinstance(result, InputArray):
+            return result
+        if result.ndim != 2:
+            return result.view(np.ndarray)
+
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is None or k is Ellipsis for k in key):
+            # not worth tracking where the axes went
+            return result
+        rows = key[0]
+        cols = key[1] if len(key) > 1 else slice(None)
+        if self.feature_names is not None:
+            result.feature_names = self.feature_names[cols]
+        if self.sample_props is not None:
+            result.sample_props = {
+                name: value[rows] for name, value in self.sample_props.items()}
+        return result
+
+    def copy(self, order='C'):
+        return super().copy(order=order)._with_metadata_of(self)
+
+    def astype(self, dtype, *args, **kwargs):
+        result = super().astype(dtype, *args, **kwargs)
+        if result is self:
+            return result
+        return result._with_metadata_of(self)
+
+    def __reduce__(self):
+        constructor, args, state = super().__reduce__()
+        return constructor, args, (state, self.feature_names,
+                                   self.sample_props)
+
+    def __setstate__(self, state):
+        state, self.feature_names, self.sample_props = state
+        super().__setstate__(state)
+
+    def todataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.view(np.ndarray), columns=self.feature_names)
+
+
+def make_inputarray(X, feature_names=None, sample_props=None):
+    """Wrap X without copying; take feature names from X.columns if any."""
+    if feature_names is None and hasattr(X, 'columns'):
+        feature_names = np.asarray(X.columns, dtype=object)
+    if hasattr(X, 'to_numpy'):
+        X = X.to_numpy()
+    return InputArray(X, feature_names=feature_names,
+                      sample_props=sample_props)